@@ -1,74 +1,136 @@
-from fastapi import APIRouter, Depends
-from datetime import datetime
+from fastapi import APIRouter, Depends, Response
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timezone
 from app.services.github_service import github_service
 from app.services.llm.openai_service import OpenAIService, get_openai_service
 from app.services.llm.llama_service import LlamaService, get_llama_service
 
 router = APIRouter()
 
-# dependency injection to get the OpenAIService instance
-# using for monitoring serivce availability
-@router.get("/health")
-async def health_check(
-    openai_service: OpenAIService = Depends(get_openai_service),
-    llama_service: LlamaService = Depends(get_llama_service)
-):
+logger = logging.getLogger(__name__)
+
+# process-local TTL cache so liveness/dashboard polling doesn't hit the
+# LLM APIs on every request; concurrent misses share one in-flight
+# refresh (single-flight) instead of queueing up their own probes
+_CACHE_TTL = float(os.getenv("HEALTH_CACHE_TTL", "10"))
+_cache = {"payload": None, "expires": 0.0}
+_cache_lock = asyncio.Lock()
+_inflight: asyncio.Task | None = None
+
+# (iso_string, whole_second) — reformatted only when the second ticks over
+_ts_cache = ("", 0)
+
+
+def _now_iso() -> str:
+    global _ts_cache
+    s = int(time.time())
+    if s != _ts_cache[1]:
+        _ts_cache = (datetime.fromtimestamp(s, tz=timezone.utc).isoformat(), s)
+    return _ts_cache[0]
+
+
+async def _build_health_payload(
+    openai_service: OpenAIService, llama_service: LlamaService
+) -> dict:
     # check github service
     github_status = "configured" if github_service else "missing_token"
-    
+
     llm_services = {}
-    
-    # openai status
+    any_ok = False
+
+    # fire all configured provider probes concurrently so wall time
+    # is max() of the probes instead of their sum
+    tasks = []
     if openai_service.available:
-        try:
-            openai_status = await openai_service.health_check()
-            llm_services["openai"] = {
-                "status": openai_status.get("status", "unknown"),
-                "model": openai_status.get("model", "unknown"),
-                "latency_ms": openai_status.get("latency_ms", 0)
-            }
-        except Exception as e:
-            llm_services["openai"] = {
-                "status": "error",
-                "error": str(e)
-            }
+        tasks.append(("openai", openai_service.health_check()))
     else:
         llm_services["openai"] = {"status": "not_configured"}
-    
-    # llama status
+
     if llama_service.available:
-        try:
-            llama_status = await llama_service.health_check()
-            print(f"LLaMA health check failed: {llama_status}")
-            llm_services["llama"] = {
-                "status": llama_status.get("status", "unknown"),
-                "model": llama_status.get("model", "unknown"),
-                "latency_ms": llama_status.get("latency_ms", 0)
-            }
-        except Exception as e:
-            llm_services["llama"] = {
-                "status": "error",
-                "error": str(e)
-            }
+        tasks.append(("llama", llama_service.health_check()))
     else:
         llm_services["llama"] = {"status": "not_configured"}
-    
-    # overall health calculation
-    overall_status = "healthy"
-    if github_status == "missing_token":
-        overall_status = "degraded"
-    
-    # check if any LLM service is working
-    working_llms = sum(1 for service in llm_services.values() 
-                      if service.get("status") == "ok")
-    if working_llms == 0:
-        overall_status = "degraded"
-    
+
+    if tasks:
+        results = await asyncio.gather(*[t for _, t in tasks], return_exceptions=True)
+        for (name, _), result in zip(tasks, results):
+            if isinstance(result, Exception):
+                llm_services[name] = {
+                    "status": "error",
+                    "error": str(result)
+                }
+                continue
+            logger.debug("%s health: %s", name, result)
+            # aggregate while folding so we don't re-walk llm_services below;
+            # health_check results always carry these keys, so index directly
+            if result["status"] == "ok":
+                any_ok = True
+            llm_services[name] = {
+                "status": result["status"],
+                "model": result["model"],
+                "latency_ms": result["latency_ms"]
+            }
+
+    # healthy only when github is configured and at least one LLM answered ok
     return {
-        "status": overall_status,
-        "timestamp": datetime.now().isoformat(),
+        "status": "healthy" if github_status == "configured" and any_ok else "degraded",
+        # computed only on cache miss; TTL hits reuse the cached string
+        "timestamp": _now_iso(),
         "services": {
             "github": github_status,
             "llm_providers": llm_services
         }
-    }
\ No newline at end of file
+    }
+
+
+async def _refresh_cache(
+    openai_service: OpenAIService, llama_service: LlamaService
+) -> dict:
+    payload = await _build_health_payload(openai_service, llama_service)
+    _cache["payload"] = payload
+    _cache["expires"] = time.monotonic() + _CACHE_TTL
+    return payload
+
+
+# dependency injection to get the OpenAIService instance
+# using for monitoring serivce availability
+@router.get("/health")
+async def health_check(
+    response: Response,
+    openai_service: OpenAIService = Depends(get_openai_service),
+    llama_service: LlamaService = Depends(get_llama_service)
+):
+    global _inflight
+    response.headers["Cache-Control"] = f"max-age={int(_CACHE_TTL)}"
+
+    # serve repeat polls within the TTL window straight from memory
+    if time.monotonic() < _cache["expires"]:
+        response.headers["X-Cache"] = "HIT"
+        return _cache["payload"]
+
+    created = False
+    async with _cache_lock:
+        # another request may have refilled the cache while we waited
+        if time.monotonic() < _cache["expires"]:
+            response.headers["X-Cache"] = "HIT"
+            return _cache["payload"]
+
+        if _inflight is None:
+            _inflight = asyncio.ensure_future(
+                _refresh_cache(openai_service, llama_service)
+            )
+            created = True
+        task = _inflight
+
+    # all concurrent misses await the same refresh
+    try:
+        payload = await task
+    finally:
+        if created:
+            _inflight = None
+
+    response.headers["X-Cache"] = "MISS"
+    return payload
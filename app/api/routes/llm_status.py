@@ -10,22 +10,25 @@ router = APIRouter()
 async def llm_status(openai: OpenAIService = Depends(get_openai_service),
                      llama: LlamaService = Depends(get_llama_service)
                      ) -> Dict[str, Any]:
-    checks: List[Dict[str, Any]] = []
-
-    # openai
-    checks.append(await openai.health_check())
+    # probe both providers concurrently instead of awaiting them in sequence
+    results = await asyncio.gather(
+        openai.health_check(),
+        llama.health_check(),
+        return_exceptions=True,
+    )
 
-    # llama
-    try:
-        llama_check = await llama.health_check()
-        checks.append(llama_check)
-    except Exception as e:
-        checks.append({
-            "provider": "llama", 
-            "status": "degraded", 
-            "error": str(e),
-            "model": getattr(llama, 'model', 'unknown')
-        })
+    checks: List[Dict[str, Any]] = []
+    for provider, service, result in (("openai", openai, results[0]),
+                                      ("llama", llama, results[1])):
+        if isinstance(result, Exception):
+            checks.append({
+                "provider": provider,
+                "status": "degraded",
+                "error": str(result),
+                "model": getattr(service, 'model', 'unknown')
+            })
+        else:
+            checks.append(result)
 
     overall = "ok" if any(c.get("status") == "ok" for c in checks) else "degraded"
     return {"overall": overall, "providers": checks}
@@ -1,3 +1,4 @@
+from typing import Optional
 from fastapi import APIRouter, HTTPException, Depends
 from app.models.review import PRReviewRequest
 from app.services.github_service import github_service
@@ -6,9 +7,15 @@ from app.services.llm.load_balancer import get_load_balancer
 
 router = APIRouter()
 
-# review service w/ the load balancer
+# review service w/ the load balancer; built once and reused so each
+# request doesn't pay service construction (same pattern as the llm services)
+_review_service_singleton: Optional[ReviewService] = None
+
 def get_review_service() -> ReviewService:
-    return ReviewService(load_balancer=get_load_balancer())
+    global _review_service_singleton
+    if _review_service_singleton is None:
+        _review_service_singleton = ReviewService(load_balancer=get_load_balancer())
+    return _review_service_singleton
 
 @router.post("/review-pr")
 async def review_pull_request(
@@ -28,6 +35,12 @@ async def review_pull_request(
     # review service -> load balancer -> provider
     review_result = await review_service.generate_review(pr_details, changed_files)
 
+    # every changed file was skip-matched or patchless (e.g. lockfiles,
+    # binaries) — nothing was sent to an LLM, so there's no review or
+    # provider metadata and no comment worth posting
+    if review_result["load_balancer"] is None:
+        return {"message": "No reviewable files in this PR"}
+
     if request.auto_comment:
         await github_service.post_review_comment(owner, repo, pr_number, review_result["review"])
 
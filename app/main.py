@@ -1,34 +1,100 @@
 # app bootstrapper
 
+import json
+import logging
+import queue
 from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from app.settings import settings
+from app.services.github_service import github_service
+from app.services.llm.load_balancer import get_load_balancer
 from app.api.routes import health, review, llm_status
 
+logger = logging.getLogger(__name__)
+
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps({
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        })
+
+
+# log records go through a queue so the event loop never blocks on a
+# slow stdout/stderr pipe; a listener thread does the actual writing
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_log_listener: Optional[QueueListener] = None
+
+
+_queue_handler: Optional[QueueHandler] = None
+
+
+def _setup_logging() -> None:
+    global _log_listener, _queue_handler
+    if _log_listener is not None:
+        return
+    stream = logging.StreamHandler()
+    if settings.log_json:
+        stream.setFormatter(_JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+    _log_listener = QueueListener(_log_queue, stream, respect_handler_level=True)
+    _log_listener.start()
+    root = logging.getLogger()
+    root.setLevel(settings.log_level)
+    _queue_handler = QueueHandler(_log_queue)
+    root.addHandler(_queue_handler)
+
+
+def _teardown_logging() -> None:
+    global _log_listener, _queue_handler
+    if _log_listener is None:
+        return
+    logging.getLogger().removeHandler(_queue_handler)
+    _log_listener.stop()
+    _log_listener = None
+    _queue_handler = None
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # startup
     # log environment/config status
-    print(f"Starting {settings.app_name} v{settings.version}")
+    _setup_logging()
+    logger.info("Starting %s v%s", settings.app_name, settings.version)
     yield
     # shutdown (if needed)
-    print(f"Shutting down {settings.app_name}")
+    if github_service:
+        await github_service.aclose()
+    await get_load_balancer().aclose()
+    logger.info("Shutting down %s", settings.app_name)
+    _teardown_logging()
 
 app = FastAPI(
     title=settings.app_name,
     version=settings.version,
     description="AI-powered code review assistant for GitHub Pull Requests",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # serialize all responses through orjson (C-native, ~2-3x stdlib json)
+    default_response_class=ORJSONResponse
 )
 
-# CORS setup
+# CORS setup — explicit origins/methods/headers plus a long max_age so
+# browsers cache preflights instead of sending OPTIONS per request
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=settings.allowed_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Authorization", "Content-Type"],
+    max_age=86400,
 )
 
 # include routers
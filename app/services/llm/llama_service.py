@@ -1,8 +1,12 @@
 from __future__ import annotations
-import asyncio, time
+import asyncio, logging, random, time
 from typing import Any, Dict, Optional
 import httpx
+import orjson
 from app.settings import settings
+from app.services.llm.rusty_client import RustyClient
+
+logger = logging.getLogger(__name__)
 
 # comm base for hf
 _HF_BASE = (getattr(settings, "hf_base_url", None) or "https://api-inference.huggingface.co").rstrip("/")
@@ -10,6 +14,33 @@ _HF_BASE = (getattr(settings, "hf_base_url", None) or "https://api-inference.hug
 # glabal singleton
 _llama_singleton: Optional["LlamaService"] = None
 
+# how long a probe result stays fresh before we hit the HF API again
+_PROBE_INTERVAL = 10.0
+
+# immutable request bodies hoisted out of the hot paths; httpx only
+# serializes these, it never mutates them
+_HEALTH_PAYLOAD = {
+    "inputs": "ping",
+    "parameters": {
+        "max_new_tokens": 1,
+        "temperature": 0.0,
+        "return_full_text": False,
+    },
+    "options": {
+        # fast probe
+        "wait_for_model": False,
+        "use_cache": True,
+    },
+}
+_GEN_OPTIONS = {
+    # not blocking on cold start
+    "use_cache": True,
+    "wait_for_model": True,
+}
+
+# transient statuses worth retrying; anything else is a config problem
+_RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
 def get_llama_service() -> "LlamaService":
     global _llama_singleton
     if _llama_singleton is None:
@@ -24,21 +55,39 @@ class LlamaService:
         self.model = getattr(settings, "hf_model", None)
         self.temperature = getattr(settings, "hf_temperature", 0.2)
         self.max_tokens = getattr(settings, "hf_max_tokens", 512)
-        self._client: Optional[httpx.AsyncClient] = None
+        self._client: Optional[httpx.AsyncClient | RustyClient] = None
+        # config can't change at runtime, so resolve availability once
+        self._available = bool(self.api_key and self.model)
+        self._last_probe: Optional[Dict[str, Any]] = None
+        self._last_probe_ts: float = 0.0
+        # caps outbound probe QPS no matter how hard /health is polled
+        self._health_sem = asyncio.BoundedSemaphore(
+            int(getattr(settings, "hf_health_concurrency", 2))
+        )
 
     @property
     def available(self) -> bool:
-        return bool(self.api_key and self.model)
+        return self._available
 
-    async def _get_client(self) -> httpx.AsyncClient:
+    async def _get_client(self) -> httpx.AsyncClient | RustyClient:
         if self._client is None:
             api_key = self.api_key.get_secret_value() if self.api_key else None
             headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
-            # Shared async client with sensible timeouts
+            if settings.http_backend == "rusty":
+                self._client = RustyClient(_HF_BASE, headers=headers, timeout_s=120.0)
+                return self._client
+            # Shared async client with sensible timeouts; HTTP/2 lets
+            # concurrent generations multiplex one TLS connection
             self._client = httpx.AsyncClient(
                 base_url=_HF_BASE,
                 headers=headers,
+                http2=True,
                 timeout=httpx.Timeout(120.0, connect=10.0, read=120.0),
+                limits=httpx.Limits(
+                    max_connections=64,
+                    max_keepalive_connections=32,
+                    keepalive_expiry=30.0,
+                ),
             )
         return self._client
 
@@ -47,6 +96,19 @@ class LlamaService:
             await self._client.aclose()
             self._client = None
 
+    # single attempt, no backoff — for probes that must stay cheap
+    async def _request_once(
+        self,
+        method: str,
+        url: str,
+        *,
+        json_body: Optional[dict] = None,
+    ) -> httpx.Response:
+        client = await self._get_client()
+        resp = await client.request(method, url, json=json_body)
+        resp.raise_for_status()
+        return resp
+
     async def _request_with_retries(
         self,
         method: str,
@@ -57,52 +119,78 @@ class LlamaService:
     ) -> httpx.Response:
         client = await self._get_client()
         attempt = 0
-        last_exc: Optional[Exception] = None
-        while attempt <= max_retries:
+        while True:
             try:
                 resp = await client.request(method, url, json=json_body)
-                if resp.status_code in (429, 500, 502, 503, 504):
-                    try:
-                        body = resp.text
-                    except Exception:
-                        body = "<no-body>"
-                    req_id = resp.headers.get("x-request-id")
-                    print(f"[LLM RETRY] {resp.status_code} on {url} (x-request-id={req_id}) body={body[:1000]}")
-                resp.raise_for_status()
-                return resp
-            except httpx.HTTPError as e:
-                last_exc = e
+            except httpx.TransportError:
+                # network-level failures are always worth retrying
                 if attempt == max_retries:
                     raise
-                await asyncio.sleep(0.25 * (2 ** attempt))
+                await asyncio.sleep((0.25 * (2 ** attempt)) * (0.5 + random.random()))
                 attempt += 1
-        if last_exc:
-            raise last_exc
-        else:
-            raise RuntimeError("Request failed after all retries")
+                continue
+
+            if resp.status_code not in _RETRYABLE_STATUSES:
+                # 2xx returns; 401/403/404/422 etc. won't heal on retry,
+                # so fail fast instead of tripling a broken-config probe
+                resp.raise_for_status()
+                return resp
 
-    # verify token and model are available
+            # slice the raw bytes rather than decoding a potentially huge
+            # error page just for a log line
+            body = resp.content[:1000].decode("utf-8", "replace")
+            req_id = resp.headers.get("x-request-id")
+            logger.warning(
+                "LLM retry: %d on %s (x-request-id=%s) body=%s",
+                resp.status_code, url, req_id, body,
+            )
+            if attempt == max_retries:
+                resp.raise_for_status()
+            # jitter the backoff so concurrent callers don't retry in
+            # lockstep; respect an upstream Retry-After when given
+            delay = (0.25 * (2 ** attempt)) * (0.5 + random.random())
+            retry_after = resp.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    delay = max(delay, float(retry_after))
+                except ValueError:
+                    pass
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    # verify token and model are available; serves the cached probe
+    # result while fresh so polling never costs an inference per call
     async def health_check(self) -> Dict[str, Any]:
-        start = time.perf_counter()
+        if (
+            self._last_probe is not None
+            and time.monotonic() - self._last_probe_ts < _PROBE_INTERVAL
+        ):
+            return self._last_probe
+        result = await self._probe_health()
+        self._last_probe = result
+        self._last_probe_ts = time.monotonic()
+        return result
+
+    async def _probe_health(self) -> Dict[str, Any]:
+        start = time.monotonic()
         if not self.available:
-            return {"provider": "huggingface", "status": "degraded", "reason": "missing_api_key_or_model"}
+            # keep the same keys as every other branch so callers can
+            # index directly instead of defaulting through .get()
+            return {
+                "provider": "huggingface",
+                "status": "degraded",
+                "reason": "missing_api_key_or_model",
+                "model": self.model,
+                "latency_ms": 0,
+            }
 
         try:
-            payload = {
-                "inputs": "ping",
-                "parameters": {
-                    "max_new_tokens": 1,
-                    "temperature": 0.0,
-                    "return_full_text": False,
-                },
-                "options": {
-                    # fast probe
-                    "wait_for_model": False,
-                    "use_cache": True,
-                },
-            }
-            resp = await self._request_with_retries("POST", f"/models/{self.model}", json_body=payload)
-            latency_ms = int((time.perf_counter() - start) * 1000)
+            # single attempt under a hard deadline so a cold/broken model
+            # can't stall /health for the full 120s client timeout
+            async with self._health_sem:
+                async with asyncio.timeout(float(getattr(settings, "hf_health_timeout_s", 2.0))):
+                    resp = await self._request_once("POST", f"/models/{self.model}", json_body=_HEALTH_PAYLOAD)
+            latency_ms = int((time.monotonic() - start) * 1000)
             # considered as ok if successful
             return {
                 "provider": "huggingface",
@@ -110,8 +198,17 @@ class LlamaService:
                 "model": self.model,
                 "latency_ms": latency_ms,
             }
+        except TimeoutError:
+            latency_ms = int((time.monotonic() - start) * 1000)
+            return {
+                "provider": "huggingface",
+                "status": "degraded",
+                "reason": "timeout",
+                "model": self.model,
+                "latency_ms": latency_ms,
+            }
         except httpx.HTTPStatusError as e:
-            latency_ms = int((time.perf_counter() - start) * 1000)
+            latency_ms = int((time.monotonic() - start) * 1000)
             status = e.response.status_code
             if status in (401, 403):
                 reason = "unauthorized_or_forbidden"
@@ -129,7 +226,7 @@ class LlamaService:
                 "latency_ms": latency_ms,
             }
         except Exception as e:
-            latency_ms = int((time.perf_counter() - start) * 1000)
+            latency_ms = int((time.monotonic() - start) * 1000)
             return {
                 "provider": "huggingface",
                 "status": "degraded",
@@ -175,15 +272,11 @@ class LlamaService:
         payload = {
             "inputs": effective_prompt,
             "parameters": params,
-            "options": {
-                # not blocking on cold start
-                "use_cache": True,
-                "wait_for_model": True, 
-            },
+            "options": _GEN_OPTIONS,
         }
 
         resp = await self._request_with_retries("POST", f"/models/{self.model}", json_body=payload)
-        data = resp.json()
+        data = orjson.loads(resp.content)
 
         message: Optional[str] = None
         try:
@@ -1,164 +1,289 @@
 from __future__ import annotations
 import asyncio
+import logging
+import math
+import threading
 import time
+from collections import Counter
 from typing import Any, Dict, List, Optional, Literal
 from dataclasses import dataclass, field
 from enum import Enum
 
+from app.settings import settings
 from app.services.llm.openai_service import OpenAIService
 from app.services.llm.llama_service import LlamaService
 
+logger = logging.getLogger(__name__)
+
 class ProviderStatus(Enum):
     HEALTHY = "healthy"
     DEGRADED = "degraded"
     FAILED = "failed"
     UNKNOWN = "unknown"
 
-@dataclass
+# slots: no per-instance __dict__, and faster attribute access on the
+# fields the selection/metrics paths touch per request
+@dataclass(slots=True)
 class ProviderInfo:
     name: str
     service: OpenAIService | LlamaService
     status: ProviderStatus = ProviderStatus.UNKNOWN
+    weight: int = 1
+    in_flight: int = 0
     last_health_check: float = 0.0
     health_check_interval: float = 30.0  # seconds
     consecutive_failures: int = 0
     max_failures: int = 3
     requests_handled: int = 0
+    failed_requests: int = 0
     last_request_time: float = 0.0
     total_latency_ms: int = 0
     average_latency_ms: float = 0.0
+    hc_cached_result: Optional[Dict[str, Any]] = None
+    hc_expires_at: float = 0.0
 
 # load balancer for multiple llm providers w/ health monitoring and failover
 class LLMLoadBalancer:
     
     def __init__(self):
         self.providers: List[ProviderInfo] = []
+        # pre-filtered selection rings, rebuilt only on status transitions
+        self._healthy_ring: List[ProviderInfo] = []
+        self._degraded_ring: List[ProviderInfo] = []
         self.current_provider_index: int = 0
+        self.current_weight: int = 0  # IPVS-style WRR state
         self.total_requests: int = 0
         self.last_health_check: float = 0.0
         self.health_check_interval: float = 30.0  # seconds
-        
+        # single-flight state so concurrent callers share one probe sweep
+        self._hc_lock = asyncio.Lock()
+        self._hc_inflight: Optional[asyncio.Future] = None
+        # background refresher so the request path never awaits a probe
+        self._hc_task: Optional[asyncio.Task] = None
+
     def add_provider(self, name: str, service: OpenAIService | LlamaService) -> None:
-        provider = ProviderInfo(name=name, service=service)
+        weight = settings.provider_weights.get(name, 1)
+        provider = ProviderInfo(name=name, service=service, weight=max(1, int(weight)))
         self.providers.append(provider)
-        print(f"Added provider: {name}")
-    
-    def get_next_provider(self) -> Optional[ProviderInfo]:
-        if not self.providers:
+        logger.info("Added provider: %s", name)
+
+    def _set_status(self, provider: ProviderInfo, new_status: ProviderStatus) -> None:
+        if provider.status == new_status:
+            return
+        provider.status = new_status
+        # rebuild the rings only when a status actually changes, so
+        # get_next_provider never filters on the hot path
+        self._healthy_ring = [p for p in self.providers if p.status == ProviderStatus.HEALTHY]
+        self._degraded_ring = [p for p in self.providers if p.status == ProviderStatus.DEGRADED]
+
+    def _provider_weight(self, provider: ProviderInfo) -> int:
+        # explicit configuration wins; otherwise derive from observed
+        # latency so faster providers absorb more of the traffic
+        configured = settings.provider_weights.get(provider.name)
+        if configured:
+            return max(1, int(configured))
+        if provider.average_latency_ms:
+            return max(1, round(1000.0 / provider.average_latency_ms))
+        return provider.weight
+
+    def get_next_provider(self, exclude: Optional[set] = None) -> Optional[ProviderInfo]:
+        # healthy providers first, falling back to degraded ones; the
+        # rings are maintained on status transitions so this is O(1)
+        ring = self._healthy_ring or self._degraded_ring
+        if exclude:
+            # failover path: skip providers that already failed this request
+            ring = [p for p in ring if p.name not in exclude]
+        if not ring:
             return None
-            
-        # find healthy providers
-        healthy_providers = [p for p in self.providers if p.status == ProviderStatus.HEALTHY]
-        
-        if not healthy_providers:
-            # no healthy providers, try degraded ones
-            degraded_providers = [p for p in self.providers if p.status == ProviderStatus.DEGRADED]
-            if degraded_providers:
-                healthy_providers = degraded_providers
-            else:
-                return None  # no available providers
-        
-        # round-robin selection
-        provider = healthy_providers[self.current_provider_index % len(healthy_providers)]
-        self.current_provider_index += 1
-        
-        return provider
+
+        n = len(ring)
+        if n == 1:
+            return ring[0]
+
+        algorithm = settings.lb_algorithm
+        if algorithm == "least_conn":
+            # least in-flight wins; ties fall to the least-used provider
+            return min(ring, key=lambda p: (p.in_flight, p.requests_handled))
+        if algorithm == "rr":
+            self.current_provider_index = (self.current_provider_index + 1) % n
+            return ring[self.current_provider_index]
+
+        # weighted round-robin (IPVS scheduling loop): providers with a
+        # higher weight are selected proportionally more often
+        weights = [self._provider_weight(p) for p in ring]
+        max_weight = max(weights)
+        gcd_weight = math.gcd(*weights)
+        while True:
+            self.current_provider_index = (self.current_provider_index + 1) % n
+            if self.current_provider_index == 0:
+                self.current_weight -= gcd_weight
+                if self.current_weight <= 0:
+                    self.current_weight = max_weight
+            if weights[self.current_provider_index] >= self.current_weight:
+                return ring[self.current_provider_index]
     
     async def health_check_provider(self, provider: ProviderInfo) -> None:
+        # serve from the per-provider cache while it's fresh
+        if provider.hc_cached_result is not None and time.time() < provider.hc_expires_at:
+            return
         try:
-            start_time = time.perf_counter()
             health_result = await provider.service.health_check()
-            latency_ms = int((time.perf_counter() - start_time) * 1000)
-            
+            provider.hc_cached_result = health_result
+            provider.hc_expires_at = time.time() + settings.hc_ttl_s
+
+
             # update provider status based on health check
             if health_result.get("status") == "ok":
-                provider.status = ProviderStatus.HEALTHY
+                self._set_status(provider, ProviderStatus.HEALTHY)
                 provider.consecutive_failures = 0
             else:
-                provider.status = ProviderStatus.DEGRADED
+                self._set_status(provider, ProviderStatus.DEGRADED)
                 provider.consecutive_failures += 1
-                
+
                 # mark as failed if too many consecutive failures
                 if provider.consecutive_failures >= provider.max_failures:
-                    provider.status = ProviderStatus.FAILED
-                    print(f"Provider {provider.name} marked as failed after {provider.consecutive_failures} failures")
+                    self._set_status(provider, ProviderStatus.FAILED)
+                    logger.warning(
+                        "Provider %s marked as failed after %d failures",
+                        provider.name, provider.consecutive_failures,
+                    )
             
-            # update metrics
+            # probe latency deliberately stays out of the request-latency
+            # metrics — it used to skew average_latency_ms
             provider.last_health_check = time.time()
-            provider.total_latency_ms += latency_ms
-            provider.average_latency_ms = provider.total_latency_ms / max(provider.requests_handled, 1)
-            
+
         except Exception as e:
-            provider.status = ProviderStatus.FAILED
+            self._set_status(provider, ProviderStatus.FAILED)
             provider.consecutive_failures += 1
-            print(f"Health check failed for {provider.name}: {e}")
+            logger.warning("Health check failed for %s: %s", provider.name, e)
     
     async def health_check_all(self) -> None:
         if time.time() - self.last_health_check < self.health_check_interval:
             return  # skip if too soon
-            
+
+        # coalesce a burst of concurrent callers onto one probe sweep
+        created = False
+        async with self._hc_lock:
+            if time.time() - self.last_health_check < self.health_check_interval:
+                return
+            if self._hc_inflight is None:
+                self._hc_inflight = asyncio.ensure_future(self._do_health_check_all())
+                created = True
+            task = self._hc_inflight
+        try:
+            await task
+        finally:
+            if created:
+                self._hc_inflight = None
+
+    async def _do_health_check_all(self) -> None:
         self.last_health_check = time.time()
-        
+
         # check all providers concurrently
         tasks = [self.health_check_provider(provider) for provider in self.providers]
         await asyncio.gather(*tasks, return_exceptions=True)
+
+    # lazily started from the first request; runs for the process lifetime
+    def _ensure_hc_task(self) -> None:
+        if self._hc_task is None or self._hc_task.done():
+            self._hc_task = asyncio.create_task(self._hc_loop())
+
+    async def _hc_loop(self) -> None:
+        while True:
+            await self._do_health_check_all()
+            await asyncio.sleep(self.health_check_interval)
+
+    async def aclose(self) -> None:
+        if self._hc_task is not None:
+            self._hc_task.cancel()
+            try:
+                await self._hc_task
+            except asyncio.CancelledError:
+                pass
+            self._hc_task = None
     
     async def generate_review(self, prompt: str, **kwargs) -> Dict[str, Any]:
-        # ensure health checks are up to date
-        await self.health_check_all()
-        
-        # get next available provider
-        provider = self.get_next_provider()
-        if not provider:
-            raise RuntimeError("No available LLM providers")
-        
-        try:
-            # track request start
-            start_time = time.perf_counter()
-            provider.requests_handled += 1
-            provider.last_request_time = time.time()
-            
-            # generate review
-            result = await provider.service.generate_review(prompt, **kwargs)
-            
-            # update metrics
-            latency_ms = int((time.perf_counter() - start_time) * 1000)
-            provider.total_latency_ms += latency_ms
-            provider.average_latency_ms = provider.total_latency_ms / provider.requests_handled
-            
-            # add load balancer metadata
-            result["load_balancer"] = {
-                "provider_used": provider.name,
-                "provider_status": provider.status.value,
-                "latency_ms": latency_ms,
-                "total_requests": self.total_requests + 1
-            }
-            
-            self.total_requests += 1
-            return result
-            
-        except Exception as e:
-            # mark provider as degraded on failure
-            provider.consecutive_failures += 1
-            if provider.consecutive_failures >= provider.max_failures:
-                provider.status = ProviderStatus.FAILED
-                print(f"Provider {provider.name} marked as failed after request failure")
-            
-            # try to get another provider for retry
-            fallback_provider = self.get_next_provider()
-            if fallback_provider and fallback_provider != provider:
-                print(f"Retrying with fallback provider: {fallback_provider.name}")
-                return await self.generate_review(prompt, **kwargs)
-            else:
-                raise e
+        # health status is refreshed by the background task; the request
+        # path just reads the cached provider states
+        self._ensure_hc_task()
+
+        # bounded failover loop — each failed provider is excluded from
+        # the next pick, so a request can never retry itself forever
+        tried: set = set()
+        last_exc: Optional[Exception] = None
+        for _ in range(settings.lb_max_attempts):
+            provider = self.get_next_provider(exclude=tried)
+            if not provider and not tried:
+                # cold start: statuses are UNKNOWN until the first sweep
+                # lands, so probe inline once rather than failing the request
+                await self.health_check_all()
+                provider = self.get_next_provider(exclude=tried)
+            if not provider:
+                break
+
+            provider.in_flight += 1
+            try:
+                # track request start
+                start_time = time.perf_counter()
+
+                # generate review
+                result = await provider.service.generate_review(prompt, **kwargs)
+
+                # update metrics only for completed requests (a raise above
+                # leaves no partial state behind), computed into locals and
+                # written in one block; the exponential moving average keeps
+                # the latency figure recent-weighted and O(1)
+                latency_ms = int((time.perf_counter() - start_time) * 1000)
+                alpha = 0.2
+                avg = provider.average_latency_ms
+                provider.requests_handled += 1
+                provider.last_request_time = time.time()
+                provider.total_latency_ms += latency_ms
+                provider.average_latency_ms = (
+                    alpha * latency_ms + (1 - alpha) * avg if avg else latency_ms
+                )
+
+                # add load balancer metadata
+                result["load_balancer"] = {
+                    "provider_used": provider.name,
+                    "provider_status": provider.status.value,
+                    "latency_ms": latency_ms,
+                    "total_requests": self.total_requests + 1
+                }
+
+                self.total_requests += 1
+                return result
+
+            except Exception as e:
+                # mark provider as degraded on failure
+                last_exc = e
+                tried.add(provider.name)
+                # failed attempts count separately so they don't skew the
+                # least-conn/WRR bookkeeping built on requests_handled
+                provider.failed_requests += 1
+                provider.consecutive_failures += 1
+                if provider.consecutive_failures >= provider.max_failures:
+                    self._set_status(provider, ProviderStatus.FAILED)
+                    logger.warning(
+                        "Provider %s marked as failed after request failure", provider.name
+                    )
+            finally:
+                provider.in_flight -= 1
+
+        if last_exc is not None:
+            raise last_exc
+        raise RuntimeError("No available LLM providers")
     
     def get_stats(self) -> Dict[str, Any]:
-        healthy_count = sum(1 for p in self.providers if p.status == ProviderStatus.HEALTHY)
-        degraded_count = sum(1 for p in self.providers if p.status == ProviderStatus.DEGRADED)
-        failed_count = sum(1 for p in self.providers if p.status == ProviderStatus.FAILED)
-        
-        # calculate distribution percentages
-        total_requests = sum(p.requests_handled for p in self.providers)
+        # one pass for status counts and the request total (instead of a
+        # sum() generator per status), then one for the percentages,
+        # which need the total first
+        counts: Counter = Counter()
+        total_requests = 0
+        for p in self.providers:
+            counts[p.status] += 1
+            total_requests += p.requests_handled
+
         distribution = {}
         for provider in self.providers:
             if total_requests > 0:
@@ -166,14 +291,14 @@ class LLMLoadBalancer:
                 distribution[provider.name] = f"{percentage:.1f}%"
             else:
                 distribution[provider.name] = "0%"
-        
+
         return {
             "total_requests": self.total_requests,
             "providers": {
                 "total": len(self.providers),
-                "healthy": healthy_count,
-                "degraded": degraded_count,
-                "failed": failed_count
+                "healthy": counts[ProviderStatus.HEALTHY],
+                "degraded": counts[ProviderStatus.DEGRADED],
+                "failed": counts[ProviderStatus.FAILED]
             },
             "distribution": distribution,
             "last_health_check": self.last_health_check,
@@ -187,6 +312,7 @@ class LLMLoadBalancer:
                 "name": provider.name,
                 "status": provider.status.value,
                 "requests_handled": provider.requests_handled,
+                "failed_requests": provider.failed_requests,
                 "last_request": provider.last_request_time,
                 "average_latency_ms": round(provider.average_latency_ms, 2),
                 "consecutive_failures": provider.consecutive_failures,
@@ -196,21 +322,27 @@ class LLMLoadBalancer:
 
 # global singleton instance
 _load_balancer_singleton: Optional[LLMLoadBalancer] = None
+_lb_lock = threading.Lock()
+
+def _init_providers(lb: LLMLoadBalancer) -> None:
+    # add providers if they're configured
+    if settings.is_openai_configured():
+        from app.services.llm.openai_service import get_openai_service
+        lb.add_provider("openai", get_openai_service())
+
+    if settings.is_huggingface_configured():
+        from app.services.llm.llama_service import get_llama_service
+        lb.add_provider("huggingface", get_llama_service())
 
 def get_load_balancer() -> LLMLoadBalancer:
     global _load_balancer_singleton
     if _load_balancer_singleton is None:
-        _load_balancer_singleton = LLMLoadBalancer()
-        
-        # add providers if they're configured
-        from app.settings import settings
-        
-        if settings.is_openai_configured():
-            from app.services.llm.openai_service import get_openai_service
-            _load_balancer_singleton.add_provider("openai", get_openai_service())
-        
-        if settings.is_huggingface_configured():
-            from app.services.llm.llama_service import get_llama_service
-            _load_balancer_singleton.add_provider("huggingface", get_llama_service())
-    
+        # double-checked locking: two first requests racing here must not
+        # both construct and register providers twice (which would also
+        # skew the selection rotation)
+        with _lb_lock:
+            if _load_balancer_singleton is None:
+                lb = LLMLoadBalancer()
+                _init_providers(lb)
+                _load_balancer_singleton = lb
     return _load_balancer_singleton
\ No newline at end of file
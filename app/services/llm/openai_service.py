@@ -1,8 +1,12 @@
 from __future__ import annotations
-import asyncio, random, time
+import asyncio, logging, random, time
 from typing import Any, Dict, Optional
 import httpx
-from app.settings import settings 
+import orjson
+from app.settings import settings
+from app.services.llm.rusty_client import RustyClient
+
+logger = logging.getLogger(__name__)
 
 # communication file with OpenAI API
 _OPENAI_BASE = (getattr(settings, "openai_base_url", None) or "https://api.openai.com/v1").rstrip("/")
@@ -10,6 +14,11 @@ _OPENAI_BASE = (getattr(settings, "openai_base_url", None) or "https://api.opena
 # this is for global singleton dependency injection
 _openai_singleton: Optional['OpenAIService'] = None
 
+# transient statuses worth retrying; anything else is a config problem
+_RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
 # gets singleton instance and ensures only one service exists
 def get_openai_service() -> OpenAIService:
     """Get or create the singleton OpenAIService instance."""
@@ -26,24 +35,36 @@ class OpenAIService:
         self.temperature = settings.openai_temperature
         self.max_tokens = settings.openai_max_tokens
         self.org = getattr(settings, "openai_org", None)
-        self._client: Optional[httpx.AsyncClient] = None
+        self._client: Optional[httpx.AsyncClient | RustyClient] = None
+        # config can't change at runtime, so resolve availability once
+        self._available = bool(self.api_key)
+        # caps outbound probe QPS no matter how hard /health is polled
+        self._health_sem = asyncio.BoundedSemaphore(
+            int(getattr(settings, "openai_health_concurrency", 2))
+        )
 
     @property
     def available(self) -> bool:
-        return bool(self.api_key)
+        return self._available
 
     # creates HTTP client only when needed w/ auth (sets up headers and timeouts)
-    async def _get_client(self) -> httpx.AsyncClient:
+    async def _get_client(self) -> httpx.AsyncClient | RustyClient:
         if self._client is None:
             api_key = self.api_key.get_secret_value() if self.api_key else None
             headers = {"Authorization": f"Bearer {api_key}"}
             if self.org:
                 headers["OpenAI-Organization"] = self.org
-            # a single shared client with sane defaults
+            if settings.http_backend == "rusty":
+                self._client = RustyClient(_OPENAI_BASE, headers=headers, timeout_s=120.0)
+                return self._client
+            # a single shared client with sane defaults; HTTP/2 multiplexes
+            # concurrent completions over one TLS connection
             self._client = httpx.AsyncClient(
                 base_url=_OPENAI_BASE,
                 headers=headers,
+                http2=True,
                 timeout=httpx.Timeout(120.0, connect=10.0, read=120.0),
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
             )
         return self._client
 
@@ -53,36 +74,57 @@ class OpenAIService:
             await self._client.aclose()
             self._client = None
 
-    # retries on specific errors (429, 500, 502, 503, 504) w/ increased delay
+    # retries on specific errors (429, 500, 502, 503, 504) w/ jittered backoff
     async def _request_with_retries(
         self, method: str, url: str, *, json_body: Optional[dict] = None, max_retries: int = 2
     ) -> httpx.Response:
         client = await self._get_client()
+        # serialize the payload once with orjson instead of letting httpx
+        # run stdlib json.dumps on every attempt (rusty takes the dict as-is)
+        content: Optional[bytes] = None
+        if json_body is not None and isinstance(client, httpx.AsyncClient):
+            content = orjson.dumps(json_body)
         attempt = 0
-        last_exc: Optional[Exception] = None
-        while attempt <= max_retries:
+        while True:
             try:
-                resp = await client.request(method, url, json=json_body)
-                if resp.status_code in (429, 500, 502, 503, 504):
-                    # log details so you know *what* is failing
-                    try:
-                        body = resp.text
-                    except Exception:
-                        body = "<no-body>"
-                    req_id = resp.headers.get("x-request-id")  # useful for support
-                    print(f"[LLM RETRY] {resp.status_code} on {url} (x-request-id={req_id}) body={body[:1000]}")
-                resp.raise_for_status()
-                return resp
-            except httpx.HTTPError as e:
-                last_exc = e
+                if content is not None:
+                    resp = await client.request(method, url, content=content, headers=_JSON_HEADERS)
+                else:
+                    resp = await client.request(method, url, json=json_body)
+            except httpx.TransportError:
+                # network-level failures are always worth retrying
                 if attempt == max_retries:
                     raise
-                await asyncio.sleep(0.25 * (2 ** attempt))
+                await asyncio.sleep((0.25 * (2 ** attempt)) * (0.5 + random.random()))
                 attempt += 1
-        if last_exc:
-                raise last_exc
-        else:
-                raise RuntimeError("Request failed after all retries")
+                continue
+
+            if resp.status_code not in _RETRYABLE_STATUSES:
+                # 2xx returns; 401/403/404 etc. won't heal on retry
+                resp.raise_for_status()
+                return resp
+
+            # log details so you know *what* is failing — slice the raw
+            # bytes rather than decoding a potentially huge error page
+            body = resp.content[:1000].decode("utf-8", "replace")
+            req_id = resp.headers.get("x-request-id")  # useful for support
+            logger.warning(
+                "LLM retry: %d on %s (x-request-id=%s) body=%s",
+                resp.status_code, url, req_id, body,
+            )
+            if attempt == max_retries:
+                resp.raise_for_status()
+            # jitter decorrelates retries across parallel callers; a
+            # numeric Retry-After (common on 429s) takes precedence
+            delay = (0.25 * (2 ** attempt)) * (0.5 + random.random())
+            retry_after = resp.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    delay = max(delay, float(retry_after))
+                except ValueError:
+                    pass
+            await asyncio.sleep(delay)
+            attempt += 1
 
     # the health check endpoint called by llm_status.py
     async def health_check(self) -> Dict[str, Any]:
@@ -91,14 +133,23 @@ class OpenAIService:
         """
         start = time.perf_counter()
         if not self.available:
-            return {"provider": "openai", "status": "degraded", "reason": "missing_api_key"}
+            # keep the same keys as every other branch so callers can
+            # index directly instead of defaulting through .get()
+            return {
+                "provider": "openai",
+                "status": "degraded",
+                "reason": "missing_api_key",
+                "model": self.model,
+                "latency_ms": 0,
+            }
 
         try:
             # best-effort: confirm the configured model is visible/usable
             # GET /v1/models/{model} is cheaper than listing all models
-            resp = await self._request_with_retries("GET", f"/models/{self.model}")
+            async with self._health_sem:
+                resp = await self._request_with_retries("GET", f"/models/{self.model}")
             latency_ms = int((time.perf_counter() - start) * 1000)
-            data = resp.json()
+            data = orjson.loads(resp.content)
             return {
                 "provider": "openai",
                 "status": "ok",
@@ -155,7 +206,7 @@ class OpenAIService:
 
         # making the API call w/ payload
         resp = await self._request_with_retries("POST", "/chat/completions", json_body=payload)
-        data = resp.json()
+        data = orjson.loads(resp.content)
         # extracting the response content and structuring
         try:
             message = data["choices"][0]["message"]["content"]
@@ -0,0 +1,56 @@
+from __future__ import annotations
+from typing import Dict, Optional
+import httpx
+
+# optional Rust-backed HTTP client (rusty-req / Tokio + reqwest); only
+# imported when settings.http_backend selects it, so the package stays an
+# optional dependency
+
+
+class RustyClient:
+    """
+    Minimal adapter exposing the slice of the httpx.AsyncClient surface the
+    LLM services use (request()/aclose()) on top of rusty-req. Responses are
+    translated back into httpx.Response objects so the retry loops and
+    orjson decoding paths stay backend-agnostic.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout_s: float = 120.0,
+    ):
+        try:
+            import rusty_req
+        except ImportError as exc:
+            raise RuntimeError(
+                "http_backend='rusty' requires the optional rusty-req package "
+                "(pip install rusty-req)"
+            ) from exc
+        self._rusty = rusty_req
+        self.base_url = base_url.rstrip("/")
+        self.headers = dict(headers or {})
+        self.timeout_s = timeout_s
+
+    async def request(
+        self, method: str, url: str, *, json: Optional[dict] = None
+    ) -> httpx.Response:
+        full_url = url if url.startswith("http") else self.base_url + url
+        result = await self._rusty.fetch_single(
+            url=full_url,
+            method=method,
+            headers=self.headers,
+            json=json,
+            timeout=self.timeout_s,
+        )
+        return httpx.Response(
+            status_code=int(result.get("status", 599)),
+            headers=result.get("headers") or {},
+            content=result.get("body") or b"",
+            request=httpx.Request(method, full_url),
+        )
+
+    async def aclose(self) -> None:
+        # rusty-req shares one module-level reqwest client; nothing to close
+        return None
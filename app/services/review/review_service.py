@@ -1,10 +1,57 @@
 from __future__ import annotations
+import asyncio
+import io
+import textwrap
+from fnmatch import fnmatch
 from typing import Any, Dict, List, Optional
 
 def _get_lb():
     from app.services.llm.load_balancer import get_load_balancer
     return get_load_balancer()
 
+# rough token cost of the template + per-file scaffolding, reserved off
+# the top of the prompt budget
+_PROMPT_OVERHEAD_TOKENS = 200
+
+# tokenizer resolved once on first use; None means tiktoken (or its
+# encoding data) is unavailable and we fall back to the char budget
+_enc = None
+_enc_resolved = False
+
+def _get_encoder():
+    global _enc, _enc_resolved
+    if not _enc_resolved:
+        _enc_resolved = True
+        try:
+            import tiktoken
+            from app.settings import settings
+            try:
+                _enc = tiktoken.encoding_for_model(settings.openai_model)
+            except KeyError:
+                _enc = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _enc = None
+    return _enc
+
+# static template dedented once at import; only the dynamic bits are
+# formatted per call
+_PROMPT_TEMPLATE = textwrap.dedent("""\
+    You are an expert software engineer performing a code review.
+
+    Please analyze the following code changes and provide:
+        1. **Security Issues**: Identify any potential security vulnerabilities
+        2. **Bugs**: Spot logical errors or edge cases
+        3. **Code Quality**: Suggest improvements for readability, performance, and maintainability
+        4. **Best Practices**: Recommend following language/framework conventions
+        5. **Testing**: Suggest areas that need test coverage
+
+    Focus on the most critical issues first. Be specific and actionable in your feedback.
+
+    Code Changes (Total: {total_changes} lines):
+    {files_content}
+
+    Provide your review in a clear, structured format:""")
+
 class ReviewService:
     def __init__(self, load_balancer=None):
         self.load_balancer = load_balancer or _get_lb()
@@ -12,57 +59,124 @@ class ReviewService:
     def create_review_prompt(self, pr_details: Dict[str, Any], changed_files: List[Dict[str, Any]]) -> str:
         from app.settings import settings  # local import to avoid import-time side effects
 
-        files_summary = []
+        # prompts can reach tens of KB for large PRs; stream the file
+        # sections into one buffer instead of allocating a string per file
+        buf = io.StringIO()
         total_changes = 0
 
+        # real token budget when the tokenizer is available — characters
+        # are a ~4:1 token estimate that's wildly off for code
+        enc = _get_encoder()
+        remaining_tokens = settings.openai_max_prompt_tokens - _PROMPT_OVERHEAD_TOKENS
+
         for file in changed_files:
             filename = file['filename']
+
+            # lockfiles/bundles burn tokens without adding review signal
+            if any(fnmatch(filename, p) for p in settings.skip_patterns):
+                continue
+
             additions = file.get('additions', 0)
             deletions = file.get('deletions', 0)
             total_changes += additions + deletions
 
             patch = file.get('patch', '')
 
-            if len(patch) < 2000:
-                files_summary.append(f"\n**File: {filename}**\n```diff\n{patch}\n```")
-            else:
-                files_summary.append(f"\n**File: {filename}** (Large file - {additions}+ {deletions}- lines)")
+            # truncate oversized diffs instead of dropping them entirely —
+            # the head of a patch usually carries most of the signal
+            if enc is not None:
+                if remaining_tokens <= 0:
+                    buf.write(f"\n**File: {filename}** _(omitted: prompt token budget exhausted)_\n")
+                    continue
+                tokens = enc.encode(patch)
+                if len(tokens) > remaining_tokens:
+                    dropped = len(tokens) - remaining_tokens
+                    patch = f"{enc.decode(tokens[:remaining_tokens])}\n... [truncated {dropped} tokens]"
+                    remaining_tokens = 0
+                else:
+                    remaining_tokens -= len(tokens)
+            elif len(patch) > settings.max_patch_chars:
+                dropped = len(patch) - settings.max_patch_chars
+                patch = f"{patch[:settings.max_patch_chars]}\n... [truncated {dropped} chars]"
+            buf.write(f"\n**File: {filename}**\n```diff\n{patch}\n```\n")
 
         if total_changes > settings.max_changed_lines_reviewed:
-            files_summary.append(
-                f"\n**Warning**: Total changes ({total_changes}) exceed configured limit ({settings.max_changed_lines_reviewed})"
+            buf.write(
+                f"\n**Warning**: Total changes ({total_changes}) exceed configured limit ({settings.max_changed_lines_reviewed})\n"
             )
 
-        files_content = "\n".join(files_summary)
-
-        prompt = f"""You are an expert software engineer performing a code review.
-
-            Please analyze the following code changes and provide:
-                1. **Security Issues**: Identify any potential security vulnerabilities
-                2. **Bugs**: Spot logical errors or edge cases
-                3. **Code Quality**: Suggest improvements for readability, performance, and maintainability
-                4. **Best Practices**: Recommend following language/framework conventions
-                5. **Testing**: Suggest areas that need test coverage
-
-            Focus on the most critical issues first. Be specific and actionable in your feedback.
-
-            Code Changes (Total: {total_changes} lines):
-            {files_content}
-
-            Provide your review in a clear, structured format:"""
-
-        return prompt
+        return _PROMPT_TEMPLATE.format(
+            total_changes=total_changes, files_content=buf.getvalue()
+        )
 
     async def generate_review(self, pr_details: Dict[str, Any], changed_files: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
         if not self.load_balancer:
             raise RuntimeError("Load balancer not configured")
 
-        prompt = self.create_review_prompt(pr_details, changed_files)
-        # lb handles health checks, selection, retries, and metadata
-        result = await self.load_balancer.generate_review(prompt, **kwargs)
+        from app.settings import settings
+
+        # filter before the fan-out: a skip-matched or patchless file
+        # (lockfiles, binaries) would still cost a full LLM round-trip on
+        # an empty prompt and invite a fabricated section in the output
+        files_to_review = [
+            f for f in changed_files
+            if f.get('patch')
+            and not any(fnmatch(f['filename'], p) for p in settings.skip_patterns)
+        ]
+
+        # a PR can consist entirely of skipped/patchless files; report
+        # that instead of fanning out zero calls and returning a result
+        # with no load-balancer metadata for the route to index into
+        if not files_to_review:
+            return {"review": "", "load_balancer": None}
+
+        # the per-file prompts can't see the PR-wide total, so enforce
+        # the changed-lines limit here across the whole file set
+        total_changes = sum(
+            f.get('additions', 0) + f.get('deletions', 0) for f in files_to_review
+        )
+
+        # review files in parallel (bounded) so the load balancer can
+        # spread them across providers instead of one mega-prompt
+        sem = asyncio.Semaphore(settings.max_concurrent_file_reviews)
+
+        async def _review_one(file: Dict[str, Any]) -> Dict[str, Any]:
+            async with sem:
+                # lb handles health checks, selection, retries, and metadata
+                return await self.load_balancer.generate_review(
+                    self.create_review_prompt(pr_details, [file]), **kwargs
+                )
+
+        results = await asyncio.gather(
+            *(_review_one(f) for f in files_to_review), return_exceptions=True
+        )
+
+        sections: List[str] = []
+        lb_meta: Optional[Dict[str, Any]] = None
+        first_error: Optional[Exception] = None
+        for file, result in zip(files_to_review, results):
+            filename = file.get('filename', 'unknown')
+            if isinstance(result, Exception):
+                first_error = first_error or result
+                sections.append(f"### {filename}\n\n_Review failed: {result}_")
+                continue
+            if lb_meta is None:
+                lb_meta = result.get("load_balancer")
+            sections.append(f"### {filename}\n\n{result.get('content') or result}")
+
+        # no file made it through any provider — surface the failure
+        if lb_meta is None and first_error is not None:
+            raise first_error
+
+        if total_changes > settings.max_changed_lines_reviewed:
+            sections.insert(
+                0,
+                f"**Warning**: Total changes ({total_changes}) exceed configured limit ({settings.max_changed_lines_reviewed})",
+            )
+
         return {
-            "review": result.get("content") or result,
-            "load_balancer": result.get("load_balancer"),
+            "review": "\n\n".join(sections),
+            "load_balancer": lb_meta,
         }
 
     def lb_stats(self) -> Dict[str, Any]:
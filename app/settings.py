@@ -1,8 +1,26 @@
 from __future__ import annotations
-from functools import lru_cache
-from typing import Optional, List, Literal
-from pydantic_settings import BaseSettings
-from pydantic import Field, SecretStr, field_validator
+import os
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, List, Literal
+from pydantic_settings import BaseSettings, EnvSettingsSource, SettingsConfigDict
+from pydantic import Field, PrivateAttr, SecretStr, field_validator
+
+# in production the orchestrator injects env vars directly; skip the
+# dotenv stat()+parse that every Settings() construction would pay
+_ENV_FILE = ".env" if os.getenv("ENVIRONMENT", "development") != "production" else None
+
+_GITHUB_API_BASE = "https://api.github.com"
+_GH_ACCEPT = "application/vnd.github.v3+json"
+
+# env vars don't change after process start, so snapshot them once
+# (pre-lowercased for the case-insensitive match) — each Settings()
+# then reads a plain dict instead of os.environ per field
+_ENV_SNAPSHOT = {k.lower(): v for k, v in os.environ.items()}
+
+
+class _SnapshotEnvSource(EnvSettingsSource):
+    def _load_env_vars(self):
+        return _ENV_SNAPSHOT
 
 
 class Settings(BaseSettings):
@@ -19,6 +37,10 @@ class Settings(BaseSettings):
     port: int = 8000
     allowed_origins: List[str] = Field(default_factory=lambda: ["*"])  # CORS
 
+    # outbound LLM HTTP backend; "rusty" routes through the optional
+    # Rust-backed rusty-req client for GIL-free fan-out
+    http_backend: Literal["httpx", "rusty"] = "httpx"
+
     # HTTP/client defaults (centralize timeouts/retries)
     http_connect_timeout_s: float = 5.0
     http_read_timeout_s: float = 15.0
@@ -26,7 +48,7 @@ class Settings(BaseSettings):
     http_max_retries: int = 2
 
     # GitHub (prefer GitHub App; keep PAT for dev)
-    github_api_base: str = "https://api.github.com"
+    github_api_base: str = _GITHUB_API_BASE
     github_token: Optional[SecretStr] = None  # PAT (dev only)
     github_app_id: Optional[str] = None
     github_webhook_secret: Optional[SecretStr] = None
@@ -40,6 +62,7 @@ class Settings(BaseSettings):
     openai_model: str = "gpt-4o-mini"  # keep configurable; override via env
     openai_max_tokens: int = 1500
     openai_temperature: float = 0.3
+    openai_health_concurrency: int = 2  # cap on concurrent health probes
 
     # hugging face or local llms
     hf_api_key: Optional[SecretStr] = None
@@ -47,6 +70,8 @@ class Settings(BaseSettings):
     hf_temperature: float = 0.2
     hf_max_tokens: int = 512
     hf_base_url: Optional[str] = None
+    hf_health_timeout_s: float = 2.0  # hard budget for /health probes
+    hf_health_concurrency: int = 2  # cap on concurrent health probes
 
     # embeddings / vectors 
     embeddings_provider: Literal["openai", "huggingface", "local"] = "openai"
@@ -59,22 +84,68 @@ class Settings(BaseSettings):
     queue_kind: Literal["redis"] = "redis"
     redis_url: Optional[str] = None  # e.g., redis://localhost:6379/0
 
+    # load balancing
+    # explicit per-provider weights, e.g. {"openai": 3, "huggingface": 1};
+    # unlisted providers get a weight derived from observed latency
+    provider_weights: Dict[str, int] = Field(default_factory=dict)
+    hc_ttl_s: float = 5.0  # how long a provider health-check result stays fresh
+    # least_conn tracks in-flight requests and avoids piling onto a slow
+    # provider; rr/wrr keep the classic rotation for A/B comparison
+    lb_algorithm: Literal["rr", "wrr", "least_conn"] = "least_conn"
+    lb_max_attempts: int = 3  # provider failover attempts per request
+
     # set limits
     max_changed_lines_reviewed: int = 4000
     max_findings_per_file: int = 20
     max_concurrent_file_reviews: int = 4
+    max_patch_chars: int = 4000  # per-file diff budget in the prompt (fallback when tokenizer unavailable)
+    openai_max_prompt_tokens: int = 6000  # total diff token budget per prompt
+    # generated/vendored files that add tokens but no review signal
+    skip_patterns: List[str] = Field(default_factory=lambda: ["*.lock", "dist/*", "*.min.js"])
 
     # logging
     log_level: str = "INFO"
     log_json: bool = False
     sentry_dsn: Optional[str] = None
 
-    model_config = {
-        "env_file": ".env",
-        "env_file_encoding": "utf-8",
-        "case_sensitive": False,
-        "extra": "ignore",
-    }
+    # resolved github headers, built once on first use
+    _github_headers: Optional[Mapping[str, str]] = PrivateAttr(default=None)
+
+    # configured-provider flags resolved once after validation; the
+    # is_*_configured helpers are hit per request via /llm-status and DI
+    _github_ok: bool = PrivateAttr(default=False)
+    _openai_ok: bool = PrivateAttr(default=False)
+    _huggingface_ok: bool = PrivateAttr(default=False)
+
+    model_config = SettingsConfigDict(
+        env_file=_ENV_FILE,
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        extra="ignore",
+        # config is read-only after construction: assignment raises
+        # instead of silently revalidating, and reads skip the
+        # validate-on-assignment machinery (private attrs still mutate
+        # for the lazy caches above)
+        frozen=True,
+    )
+
+    @classmethod
+    def settings_customise_sources(
+        cls, settings_cls, init_settings, env_settings, dotenv_settings, file_secret_settings
+    ):
+        # same precedence as stock BaseSettings, with the env source
+        # swapped for the import-time snapshot
+        return (
+            init_settings,
+            _SnapshotEnvSource(settings_cls),
+            dotenv_settings,
+            file_secret_settings,
+        )
+
+    def model_post_init(self, __context) -> None:
+        self._github_ok = bool(self.github_token or (self.github_app_id and self.github_private_key))
+        self._openai_ok = bool(self.openai_api_key)
+        self._huggingface_ok = bool(self.hf_api_key and self.hf_model)
 
     # validators so pydantic can convert env vars to python types
     @field_validator("allowed_origins", mode="before")
@@ -85,27 +156,32 @@ class Settings(BaseSettings):
             return [s.strip() for s in v.split(",") if s.strip()]
         return v
 
-    def get_github_headers(self) -> dict:
+    def get_github_headers(self) -> Mapping[str, str]:
         """
         PAT-only helper (dev). For GitHub App, prefer installation tokens via a dedicated service.
         """
+        if self._github_headers is not None:
+            return self._github_headers
         if not self.github_token:
             raise ValueError("GitHub token (PAT) not configured")
-        return {
-            "Authorization": f"token {self.github_token.get_secret_value()}",
-            "Accept": "application/vnd.github.v3+json",
-            "User-Agent": f"{self.app_name}/{self.version}",
-        }
+        # resolve the SecretStr once; repeat callers share one read-only
+        # view, so nobody can mutate the Authorization header in place
+        self._github_headers = MappingProxyType({
+            "Authorization": "token " + self.github_token.get_secret_value(),
+            "Accept": _GH_ACCEPT,
+            "User-Agent": self.app_name + "/" + self.version,
+        })
+        return self._github_headers
 
     # convenience flags for maintainable code
     def is_github_configured(self) -> bool:
-        return bool(self.github_token or (self.github_app_id and self.github_private_key))
+        return self._github_ok
 
     def is_openai_configured(self) -> bool:
-        return bool(self.openai_api_key)
-    
+        return self._openai_ok
+
     def is_huggingface_configured(self) -> bool:
-        return bool(self.hf_api_key and self.hf_model)
+        return self._huggingface_ok
 
     def require_prod_secrets(self) -> None:
         """
@@ -123,9 +199,15 @@ class Settings(BaseSettings):
                 raise RuntimeError(f"Missing required prod config: {', '.join(missing)}")
 
 
-@lru_cache()
+# plain module singleton: a zero-arg lru_cache wrapper still hashes an
+# empty key and takes its lock on every Depends(get_settings) call
+_SETTINGS: Optional[Settings] = None
+
 def get_settings() -> Settings:
-    return Settings()
+    global _SETTINGS
+    if _SETTINGS is None:
+        _SETTINGS = Settings()
+    return _SETTINGS
 
 
 # keep this for modules expecting a global, but injecting get_settings() is better
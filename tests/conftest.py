@@ -0,0 +1,12 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+# one client (and one lifespan startup) for the whole suite; endpoint
+# tests share it instead of paying app startup per test
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as c:
+        yield c
@@ -1,5 +1,4 @@
-from fastapi.testclient import TestClient
-from app.main import app
+import asyncio
 
 def test_llm_status_smoke(monkeypatch):
     # monkeypatch OpenAIService.health_check to avoid network calls
@@ -9,14 +8,20 @@ def test_llm_status_smoke(monkeypatch):
         return {"provider": "openai", "status": "ok", "model": "test-model", "latency_ms": 10}
 
     monkeypatch.setattr(OpenAIService, "health_check", fake_health)
-    
-    # ensure DI singleton exists
-    from app.services.llm.openai_service import _openai_singleton
-    _openai_singleton = OpenAIService()
 
-    client = TestClient(app)
-    r = client.get("/llm-status")
-    assert r.status_code == 200
-    body = r.json()
+    # populate the DI singleton with a bare instance — nothing touches
+    # real service state, so skip __init__ and its client/semaphore setup
+    stub = OpenAIService.__new__(OpenAIService)
+    monkeypatch.setattr("app.services.llm.openai_service._openai_singleton", stub)
+
+    # call the handler coroutine directly — the test asserts on handler
+    # output, not middleware, so no ASGI transport needed
+    from app.api.routes.llm_status import llm_status
+    from app.services.llm.openai_service import get_openai_service
+    from app.services.llm.llama_service import get_llama_service
+
+    body = asyncio.run(llm_status(get_openai_service(), get_llama_service()))
     assert body["overall"] == "ok"
-    assert any(p["provider"] == "openai" and p["status"] == "ok" for p in body["providers"])
+    # index once, then O(1) lookups instead of scanning the provider list
+    providers_by_name = {p["provider"]: p for p in body["providers"]}
+    assert providers_by_name["openai"]["status"] == "ok"